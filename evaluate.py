@@ -0,0 +1,77 @@
+import argparse
+import sys
+import time
+
+from lib.indexing import Indexer
+from lib.preprocessing import TextProcessor
+from lib.dictionary import TermDictionary
+from lib.retrieval import Engine, read_postings, count_docs
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dictionary-file", "-t", default="dictionary.txt")
+    parser.add_argument("--postings-file", "-p", default="postings.txt")
+    parser.add_argument("--queries-file", "-q", default="queries.txt", help="File with one query per line")
+    parser.add_argument("--champions-sizes", "-r", type=int, nargs='+', default=[5, 10, 20, 50, 100])
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--min-candidates", "-k", type=int, default=10)
+    parser.add_argument("--normalize-scores", "-n", action="store_true")
+    return parser.parse_args()
+
+
+def timed_top_k(engine, query, k, exact):
+    """
+    Runs the query and returns the set of top-k document indices with a non-zero score, along with the time taken in milliseconds.
+    """
+    start = time.perf_counter()
+    matches = engine.retrieve_matches(query, exact=exact)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+    return {doc_index for doc_index, score in matches[:k] if score > 0.0}, elapsed_ms
+
+
+def main(args):
+    """
+    Reports the recall and latency of answering queries from the champion lists, for each champions size r, against the exact results.
+    Recall is the fraction of the exact top-k documents that are also found in the top-k documents answered from the champion lists.
+    The champion lists fall back to the full postings below min_candidates candidates, the same as in retrieve.py.
+    """
+    with open(args.dictionary_file, 'r') as fs:
+        dictionary = TermDictionary.read(fs)
+    with open(args.postings_file, 'r') as fs:
+        postings = read_postings(fs)
+    with open(args.queries_file, 'r') as fs:
+        queries = [line.strip() for line in fs if line.strip()]
+    if not queries:
+        sys.exit("No queries found in {}".format(args.queries_file))
+
+    num_docs = count_docs(postings)
+    text_processor = TextProcessor()
+    term_index = {term: postings[offset:offset + doc_freq] for term, doc_freq, offset in dictionary}
+
+    # Run the exact queries once; these are the reference results for every champions size
+    engine = Engine(num_docs, dictionary, postings, text_processor, args.normalize_scores)
+    exact_results = []
+    exact_total_ms = 0.0
+    for query in queries:
+        top_k, elapsed_ms = timed_top_k(engine, query, args.top_k, True)
+        exact_results.append(top_k)
+        exact_total_ms += elapsed_ms
+
+    print("{} queries, recall@{}, exact mean latency {:0.2f} ms".format(len(queries), args.top_k, exact_total_ms / len(queries)))
+    print("{:>8} {:>10} {:>14} {:>10}".format("r", "recall", "latency (ms)", "speedup"))
+    for size in args.champions_sizes:
+        champions = Indexer.index_champions(term_index, size)
+        engine = Engine(num_docs, dictionary, postings, text_processor, args.normalize_scores, champions, args.min_candidates)
+        total_recall = 0.0
+        total_ms = 0.0
+        for query, exact_top_k in zip(queries, exact_results):
+            top_k, elapsed_ms = timed_top_k(engine, query, args.top_k, False)
+            total_recall += len(top_k & exact_top_k) / len(exact_top_k) if exact_top_k else 1.0
+            total_ms += elapsed_ms
+        speedup = exact_total_ms / total_ms if total_ms > 0.0 else float('inf')
+        print("{:>8} {:>10.3f} {:>14.2f} {:>9.1f}x".format(size, total_recall / len(queries), total_ms / len(queries), speedup))
+
+
+if __name__ == "__main__":
+    main(parse_args())
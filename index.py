@@ -7,6 +7,8 @@ def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument("-d", "--documents-filename", default="documents.txt")
     parser.add_argument("-p", "--preprocessed-docs-filename", default="documents.processed")
+    parser.add_argument("-r", "--champions-size", type=int, default=None,
+                        help="If given, also writes champions.txt holding the top-r postings of each term")
     return parser.parse_args()
 
 
@@ -17,6 +19,7 @@ def main(args):
     # in.
     # For each document, store the ID, Title, and starting line in the original input file.
     # Output the above information in three files: dictionary.txt, postings.txt, and docids.txt
+    # If a champions size r is given, also output the top-r postings of each token (by token_freq) in champions.txt
     indexer = Indexer()
     with open(args.documents_filename, 'r') as docs_fs, open(args.preprocessed_docs_filename, 'r') as preprocessed_docs_fs:
         print("Indexing terms...")
@@ -33,6 +36,11 @@ def main(args):
             print("Writing postings...")
             indexer.write_postings(terms_index, ofs)
 
+        if args.champions_size:
+            with open("champions.txt", 'w') as ofs:
+                print("Writing champions...")
+                indexer.write_champions(indexer.index_champions(terms_index, args.champions_size), ofs)
+
         with open("docids.txt", 'w') as ofs:
             print("Writing docids...")
             indexer.write_docids(docs_index, ofs)
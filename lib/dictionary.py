@@ -0,0 +1,183 @@
+from array import array
+from typing import IO, Iterator
+
+
+def _encode_varint(value: int, out: bytearray):
+    """
+    Appends the non-negative integer to out as a variable length sequence of 7-bit groups, least significant group first.
+    """
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varint(data: bytes, pos: int) -> (int, int):
+    """
+    Decodes a variable length integer from data starting at pos.  Returns the integer and the position just past it.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class TermDictionary:
+    """
+    A compact, sorted dictionary of terms mapping each term to its (doc_freq, offset) pair, where the offset indicates the index in the postings
+    list where the term begins.
+
+    The terms are kept in blocks of BLOCK_SIZE terms, all encoded into a single byte string.  Within a block, each term is front-coded; it is stored
+    as the length of the prefix it shares with the previous term, followed by the remaining suffix.  The doc_freq of each term is stored inline with
+    it, and since the postings of consecutive terms are contiguous, only the offset of the first term in each block needs to be stored; the others
+    are derived by adding up the doc_freqs.  Lookups binary search the blocks on their first term, then scan a single block.
+    """
+
+    BLOCK_SIZE = 16
+
+    def __init__(self, data: bytes, block_starts: array, block_offsets: array, num_terms: int):
+        """
+        :param data: The encoded blocks of terms.
+        :param block_starts: The position in data where each block begins.
+        :param block_offsets: The postings offset of the first term in each block.
+        :param num_terms: The total number of terms in the dictionary.
+        """
+        self._data = data
+        self._block_starts = block_starts
+        self._block_offsets = block_offsets
+        self._num_terms = num_terms
+
+    @classmethod
+    def from_terms(cls, terms_and_doc_freqs) -> "TermDictionary":
+        """
+        Builds the dictionary from an iterable of (term, doc_freq) pairs given in sorted order of term.  The postings offset of each term is the sum
+        of the doc_freqs of the terms before it.
+        """
+        data = bytearray()
+        block_starts = array('Q')
+        block_offsets = array('Q')
+        num_terms = 0
+        offset = 0
+        prev = b""
+        for term, doc_freq in terms_and_doc_freqs:
+            encoded = term.encode('utf-8')
+            if num_terms > 0 and encoded <= prev:
+                raise ValueError("Terms must be unique and in sorted order; '{}' follows '{}'".format(term, prev.decode('utf-8')))
+            if num_terms % cls.BLOCK_SIZE == 0:
+                block_starts.append(len(data))
+                block_offsets.append(offset)
+                prefix_len = 0
+            else:
+                prefix_len = 0
+                max_prefix_len = min(len(prev), len(encoded))
+                while prefix_len < max_prefix_len and prev[prefix_len] == encoded[prefix_len]:
+                    prefix_len += 1
+            _encode_varint(prefix_len, data)
+            _encode_varint(len(encoded) - prefix_len, data)
+            data += encoded[prefix_len:]
+            _encode_varint(doc_freq, data)
+            num_terms += 1
+            offset += doc_freq
+            prev = encoded
+        return cls(bytes(data), block_starts, block_offsets, num_terms)
+
+    @classmethod
+    def read(cls, fs: IO) -> "TermDictionary":
+        """
+        Builds the dictionary from a dictionary file stream, as written by Indexer.write_dict(), with one "term doc_freq" pair on each line.
+        """
+        def terms_and_doc_freqs():
+            for line in fs:
+                if not line:
+                    break
+                term, doc_freq = line.strip().split(' ')
+                yield term, int(doc_freq)
+        return cls.from_terms(terms_and_doc_freqs())
+
+    def __len__(self) -> int:
+        return self._num_terms
+
+    def __contains__(self, term: str) -> bool:
+        return self.get(term) is not None
+
+    def __iter__(self) -> Iterator[tuple]:
+        """
+        Iterates over all the (term, doc_freq, offset) triplets in sorted order of term.
+        """
+        for block in range(len(self._block_starts)):
+            for encoded, doc_freq, offset in self._scan_block(block):
+                yield encoded.decode('utf-8'), doc_freq, offset
+
+    def get(self, term: str) -> (int, int):
+        """
+        Returns the (doc_freq, offset) pair for the term, or None if the term is not in the dictionary.
+        """
+        encoded = term.encode('utf-8')
+        block = self._find_block(encoded)
+        if block < 0:
+            return None
+        for candidate, doc_freq, offset in self._scan_block(block):
+            if candidate == encoded:
+                return doc_freq, offset
+            if candidate > encoded:
+                break
+        return None
+
+    def prefix(self, prefix: str) -> Iterator[tuple]:
+        """
+        Iterates over the (term, doc_freq, offset) triplets of all the terms that begin with prefix, in sorted order of term.
+        """
+        encoded = prefix.encode('utf-8')
+        # The matching terms form a contiguous range which begins either in the last block whose first term precedes the prefix or in the block
+        # after it, so we scan forward from there until we pass the end of the range.
+        for block in range(max(0, self._find_block(encoded)), len(self._block_starts)):
+            for candidate, doc_freq, offset in self._scan_block(block):
+                if candidate.startswith(encoded):
+                    yield candidate.decode('utf-8'), doc_freq, offset
+                elif candidate > encoded:
+                    return
+
+    def _first_term(self, block: int) -> bytes:
+        """
+        Decodes the first term of the block, which is always stored in full.
+        """
+        pos = self._block_starts[block]
+        _, pos = _decode_varint(self._data, pos)
+        length, pos = _decode_varint(self._data, pos)
+        return self._data[pos:pos + length]
+
+    def _find_block(self, encoded: bytes) -> int:
+        """
+        Returns the index of the last block whose first term is less than or equal to the encoded term, or -1 if there is no such block.
+        """
+        lo, hi = 0, len(self._block_starts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._first_term(mid) <= encoded:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo - 1
+
+    def _scan_block(self, block: int) -> Iterator[tuple]:
+        """
+        Decodes the block, yielding the (encoded_term, doc_freq, offset) triplet of each term in it.
+        """
+        data = self._data
+        pos = self._block_starts[block]
+        end = self._block_starts[block + 1] if block + 1 < len(self._block_starts) else len(data)
+        offset = self._block_offsets[block]
+        term = b""
+        while pos < end:
+            prefix_len, pos = _decode_varint(data, pos)
+            suffix_len, pos = _decode_varint(data, pos)
+            term = term[:prefix_len] + data[pos:pos + suffix_len]
+            pos += suffix_len
+            doc_freq, pos = _decode_varint(data, pos)
+            yield term, doc_freq, offset
+            offset += doc_freq
@@ -44,6 +44,22 @@ class Indexer:
 
         return index
 
+    @staticmethod
+    def index_champions(term_index: {str: [[int, int]]}, size: int) -> {str: [[int, int]]}:
+        """
+        Builds the champion lists (the first tier of the index) from the term_index provided.  For each term, the champion list holds the size
+        postings with the highest term frequency, kept in ascending order of document index like the full postings list.
+        Since the idf of a term is common to all of its postings, ranking by term frequency is the same as ranking by tfidf weight.
+        """
+        champions = {}
+        for term, occurrences in term_index.items():
+            if len(occurrences) <= size:
+                champions[term] = occurrences
+                continue
+            top = sorted(occurrences, key=lambda x: x[1], reverse=True)[:size]
+            champions[term] = sorted(top, key=lambda x: x[0])
+        return champions
+
     @classmethod
     def index_docs(cls, documents_fs: IO) -> [DocumentInfo]:
         """
@@ -92,6 +108,15 @@ class Indexer:
             for occurrence in occurrences:
                 out_fs.write("{} {}\n".format(occurrence[0], occurrence[1]))
 
+    @staticmethod
+    def write_champions(champions: {str: [[int, int]]}, out_fs: IO):
+        """
+        Writes out the champion lists to the file stream provided, putting one term on each line followed by its champion
+        (document_index, term_frequency) pairs.
+        """
+        for term, occurrences in champions.items():
+            out_fs.write("{} {}\n".format(term, " ".join("{} {}".format(doc_index, term_freq) for doc_index, term_freq in occurrences)))
+
     @classmethod
     def write_docids(cls, docs_index: [DocumentInfo], out_fs: IO):
         """
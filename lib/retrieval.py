@@ -1,42 +1,92 @@
 from typing import IO
 from collections import defaultdict
+from bisect import bisect_left
 import math
+import re
 
 from lib.preprocessing import TextProcessor
 from lib.indexing import Indexer, DocumentInfo
+from lib.dictionary import TermDictionary
 
 
 class Engine:
     """Performs the search queries"""
 
-    def __init__(self, num_docs: int, dictionary: {str: (int, int)}, postings: [(int, int)], text_processor: TextProcessor, normalize_scores=True):
+    WILDCARD = '*'
+    # Punctuation around a query word, which the lexer would drop, such as the brackets and comma in "(comput*),"
+    SURROUNDING_PUNCTUATION = re.compile(r"^[^\w{0}]+|[^\w{0}]+$".format(re.escape(WILDCARD)))
+
+    def __init__(self, num_docs: int, dictionary: TermDictionary, postings: [(int, int)], text_processor: TextProcessor, normalize_scores=True,
+                 champions: {str: [(int, int)]} = None, min_candidates: int = 10):
         """
         :param num_docs: Total number of documents in the collection.
-        :param dictionary: A dict of terms where each term maps to a (doc_freq, offset) tuple.  The offset indicates the index in the postings list
-            where this term begins.
+        :param dictionary: A dictionary of terms where each term maps to a (doc_freq, offset) tuple.  The offset indicates the index in the postings
+            list where this term begins.
         :param postings: A list of (doc_index, term_freq) tuples.
         :param text_processor: The text processor which will be used to process the queries.  We want the queries to be processed the same way as the
             documents would have been.
+        :param champions: Optional first tier of the index; a dict of terms where each term maps to its champion list of (doc_index, term_freq)
+            tuples.  When given, queries are answered from the documents in the champion lists of the query terms.
+        :param min_candidates: The fewest candidate documents the champion lists must yield before we fall back to scoring the full postings.
         """
 
         self._num_docs = num_docs
-        self._doc_freqs = {term: val[0] for term, val in dictionary.items()}
-        self._offsets = {term: val[1] for term, val in dictionary.items()}
+        self._dictionary = dictionary
         self._postings_doc_indices = [post[0] for post in postings]
         self._postings_term_freqs = [post[1] for post in postings]
         self._text_processor = text_processor
         self._normalize = normalize_scores
+        self._champions = champions
+        self._min_candidates = min_candidates
 
-    def retrieve_matches(self, query: str) -> [(int, float)]:
+    def retrieve_matches(self, query: str, exact: bool = False) -> [(int, float)]:
         """
         Retrieves a list of matching document indices and their match score.  The list is sorted in descending order of match score.
+        A query word ending with the WILDCARD character, once stripped of surrounding punctuation, matches every term that begins with it; the word
+        is lowercased but not stemmed, since the stem of a partial word need not be a prefix of the stem of the whole word.  A WILDCARD on its own
+        has no prefix to match and is ignored.  Query terms that are not in the dictionary are ignored.
+        If champion lists were provided and exact is not requested, only the documents found in the champion lists of the query terms are scored
+        and returned.  If these are fewer than min_candidates, every document in the collection is scored and returned instead.
         """
 
         # Get the individual terms in the query and count their frequency
+        # Wildcard words are expanded to the matching terms straight from the dictionary
         query_term_freqs = defaultdict(int)
-        for term in self._text_processor.process(query).split(' '):
+        plain_words = []
+        for word in query.split():
+            stripped = self.SURROUNDING_PUNCTUATION.sub("", word)
+            if not stripped.endswith(self.WILDCARD):
+                plain_words.append(word)
+                continue
+            prefix = stripped.rstrip(self.WILDCARD).lower()
+            if prefix:
+                for term, _, _ in self._dictionary.prefix(prefix):
+                    query_term_freqs[term] += 1
+        for term in self._text_processor.process(" ".join(plain_words)).split(' '):
             query_term_freqs[term] += 1
 
+        # Look up the (doc_freq, offset) of each query term, dropping the terms that don't occur in the collection
+        query_terms = {}
+        for term, query_term_freq in query_term_freqs.items():
+            entry = self._dictionary.get(term)
+            if entry is not None:
+                query_terms[term] = (query_term_freq, *entry)
+
+        if self._champions is not None and not exact:
+            candidates = set()
+            for term in query_terms:
+                candidates.update(doc_index for doc_index, _ in self._champions.get(term, ()))
+            if len(candidates) >= self._min_candidates:
+                return self._score_candidates(query_terms, sorted(candidates))
+
+        return self._score_all(query_terms)
+
+    def _score_all(self, query_terms: {str: (int, int, int)}) -> [(int, float)]:
+        """
+        Scores every document in the collection against the query terms by walking the full postings of each term.
+        query_terms maps each query term to its (query_term_freq, doc_freq, offset) triplet.
+        """
+
         # For each term in the query we compute the tfidf weight.
         # We also compute the tfidf weight for each term/document intersection.
 
@@ -45,28 +95,61 @@ class Engine:
         # Create a variable for the query and each document in which to accumulate the sum of squares of weights for normalization
         sum_square_weights_q = 0.0
         sum_square_weights_docs = [0.0] * self._num_docs
-        for term in query_term_freqs:
+        for query_term_freq, doc_freq, offset in query_terms.values():
             # Each term uses an idf value which is common to the query and each document/term intersection, so we compute it once and reuse it.
-            idf = math.log2(self._num_docs / self._doc_freqs[term])
+            idf = math.log2(self._num_docs / doc_freq)
             # Compute the term tfidf value for the query: w_qterm
-            w_qterm = query_term_freqs[term] * idf
+            w_qterm = query_term_freq * idf
+            sum_square_weights_q += w_qterm ** 2.0
+            # The tfidf for documents that don't contain the term is 0, so we only visit the documents in the term's postings
+            for posting in range(offset, offset + doc_freq):
+                doc_index = self._postings_doc_indices[posting]
+                # Compute the term tfidf value for the document: w_dterm
+                # Add to the similarity value for the document the q_term x d_term
+                w_dterm = self._postings_term_freqs[posting] * idf
+                similarities[doc_index][1] += w_qterm * w_dterm
+                sum_square_weights_docs[doc_index] += w_dterm ** 2.0
+
+        return self._normalize_and_sort(similarities, sum_square_weights_q, sum_square_weights_docs)
+
+    def _score_candidates(self, query_terms: {str: (int, int, int)}, candidates: [int]) -> [(int, float)]:
+        """
+        Scores only the candidate documents (given in ascending order of document index) against the query terms.  Each candidate gets its exact
+        score; its term frequencies are looked up in the full postings by binary search.
+        """
+
+        similarities = [[doc_index, 0.0] for doc_index in candidates]
+        sum_square_weights_q = 0.0
+        sum_square_weights_docs = [0.0] * len(candidates)
+        for query_term_freq, doc_freq, offset in query_terms.values():
+            idf = math.log2(self._num_docs / doc_freq)
+            w_qterm = query_term_freq * idf
             sum_square_weights_q += w_qterm ** 2.0
-            offset = self._offsets[term]
-            for doc_index in range(self._num_docs):
-                # The tfidf for documents that don't contain the term is 0, so we can just ignore them
-                if self._postings_doc_indices[offset] == doc_index:
-                    # Compute the term tfidf value for the document: w_dterm
-                    # Add to the similarity value for the document the q_term x d_term
-                    w_dterm = self._postings_term_freqs[offset] * idf
-                    similarities[doc_index][1] += w_qterm * w_dterm
-                    sum_square_weights_docs[doc_index] += w_dterm ** 2.0
-                    offset += 1
+            # The candidates are in ascending order, so each search can start from where the previous one left off
+            lo = offset
+            hi = offset + doc_freq
+            for i, doc_index in enumerate(candidates):
+                lo = bisect_left(self._postings_doc_indices, doc_index, lo, hi)
+                if lo == hi:
+                    break
+                if self._postings_doc_indices[lo] == doc_index:
+                    w_dterm = self._postings_term_freqs[lo] * idf
+                    similarities[i][1] += w_qterm * w_dterm
+                    sum_square_weights_docs[i] += w_dterm ** 2.0
+
+        return self._normalize_and_sort(similarities, sum_square_weights_q, sum_square_weights_docs)
+
+    def _normalize_and_sort(self, similarities: [[int, float]], sum_square_weights_q: float, sum_square_weights_docs: [float]) -> [(int, float)]:
+        """
+        Normalizes the similarities (if normalization is enabled) and sorts them in descending order of match score.
+        sum_square_weights_docs is aligned with similarities.
+        """
 
         # Normalize the similarities
         if self._normalize:
-            for doc_index in range(self._num_docs):
-                if similarities[doc_index][1] > 0.0:
-                    similarities[doc_index][1] /= math.sqrt(sum_square_weights_q * sum_square_weights_docs[doc_index])
+            for i in range(len(similarities)):
+                if similarities[i][1] > 0.0:
+                    similarities[i][1] /= math.sqrt(sum_square_weights_q * sum_square_weights_docs[i])
 
         # Sort the results
         similarities.sort(key=lambda x: x[1], reverse=True)
@@ -90,48 +173,78 @@ class DocumentDB:
         """
         return self._doc_info[doc_index].doc_id, self._doc_info[doc_index].title
 
-    def get_doc_text(self, doc_id: str) -> str:
+    def get_doc_text_start(self, doc_id: str) -> int:
         """
-        Returns the whole text of the document retrieved by document id code.
+        Returns the offset in the documents file of the first line of text of the document retrieved by document id code.
         """
-        doc_text = ""
-        self._docs_fs.seek(self._doc_text_start_by_id[doc_id])
-        for line in self._docs_fs:
-            if line.startswith("$DOC"):
-                break
-            doc_text += line
-        return doc_text
+        return self._doc_text_start_by_id[doc_id]
+
+    def read_doc_lines(self, offset: int, max_lines: int) -> ([str], int):
+        """
+        Reads up to max_lines lines of document text starting at the given offset in the documents file.
+        Returns the lines, with the '\n' dropped from each, along with the offset of the next line to read.  The offset of the next line is None
+        once the end of the document is reached.
+        """
+        lines = []
+        self._docs_fs.seek(offset)
+        while len(lines) < max_lines:
+            line = self._docs_fs.readline()
+            if not line or line.startswith("$DOC"):
+                return lines, None
+            lines.append(line.rstrip('\n'))
+        return lines, self._docs_fs.tell()
 
 
-def build_engine_from_filepaths(dictionary_file_path, postings_file_path, normalize_scores) -> Engine:
+def build_engine_from_filepaths(dictionary_file_path, postings_file_path, normalize_scores, champions_file_path=None, min_candidates=10) -> Engine:
     """
-    Builds an Engine object from the dictionary file and postings file specified.
+    Builds an Engine object from the dictionary file and postings file specified, and optionally from the champions file specified.
     """
 
-    # Build the dictionary of terms and (document-frequency, offset) pairs.
-    # The offsets are derived from the document frequency of each term (and the previous offset); each offset indicates the index in the postings
-    # file/list where the corresponding term begins.
     with open(dictionary_file_path, 'r') as fs:
-        dictionary = {}
-        offset = 0
-        for line in fs:
-            if not line:
-                break
-            term, count = line.strip().split(' ')
-            count = int(count)
-            dictionary[term] = (count, offset)
-            offset += count
+        dictionary = TermDictionary.read(fs)
 
-    # Build the postings list of (doc_index, term_freq) pairs
     with open(postings_file_path, 'r') as fs:
-        postings = [(int(line.strip().split(' ')[0]), int(line.strip().split(' ')[1])) for line in fs if line]
+        postings = read_postings(fs)
+
+    champions = None
+    if champions_file_path:
+        with open(champions_file_path, 'r') as fs:
+            champions = read_champions(fs)
+
+    return Engine(count_docs(postings), dictionary, postings, TextProcessor(), normalize_scores, champions, min_candidates)
+
+
+def read_postings(fs: IO) -> [(int, int)]:
+    """
+    Reads the postings list of (doc_index, term_freq) pairs from the postings file stream.
+    """
+    return [(int(line.strip().split(' ')[0]), int(line.strip().split(' ')[1])) for line in fs if line]
+
+
+def read_champions(fs: IO) -> {str: [(int, int)]}:
+    """
+    Reads the champion lists of (doc_index, term_freq) pairs for each term from the champions file stream.
+    """
+    champions = {}
+    for line in fs:
+        if not line:
+            break
+        space_split = line.strip().split(' ')
+        values = [int(x) for x in space_split[1:]]
+        champions[space_split[0]] = list(zip(values[0::2], values[1::2]))
+    return champions
+
+
+def count_docs(postings: [(int, int)]) -> int:
+    """
+    Counts the number of documents in the collection covered by the postings.
+    """
 
     # To count the number of documents in the collection, we create a set and add to it each document index, then get the size of the set
     doc_indices = set()
     for doc_index, term_freq in postings:
         doc_indices.add(doc_index)
-
-    return Engine(len(doc_indices), dictionary, postings, TextProcessor(), normalize_scores)
+    return len(doc_indices)
 
 
 def build_documents_db_from_file_paths(docids_file_path, documents_file_path) -> DocumentDB:
@@ -1,4 +1,98 @@
 import curses
+from array import array
+from bisect import bisect_right
+
+
+class _WrappedDocument:
+    """
+    Wraps the lines of a document to the screen width on demand.  Lines are read from disk in chunks of CHUNK_LINES lines as the user scrolls, and
+    only the wrapped rows of the chunks around the visible window are kept in memory.  For each chunk read so far we remember where it begins in
+    the file and on screen, so that chunks scrolled out of the window can be read again when scrolling back.
+    """
+
+    CHUNK_LINES = 50
+
+    def __init__(self, read_lines, start_offset: int, width: int, lookahead: int):
+        """
+        :param read_lines: Callable taking an (offset, max_lines) pair and returning a list of lines and the offset of the next line, which is None
+            at the end of the document.  See DocumentDB.read_doc_lines().
+        :param start_offset: The offset of the first line of the document.
+        :param width: The width of the screen.
+        :param lookahead: The number of rows beyond either side of the visible window to keep wrapped in memory.
+        """
+        self._read_lines = read_lines
+        self._width = width
+        self._lookahead = lookahead
+        self._chunk_offsets = array('Q')
+        self._chunk_first_rows = array('Q')
+        self._num_rows = 0
+        self._next_offset = start_offset
+        self._rows_by_chunk = {}
+
+    def has_row(self, row: int) -> bool:
+        """
+        Returns whether the document extends to the given row, reading ahead as far as needed to tell.
+        """
+        while self._next_offset is not None and self._num_rows <= row + self._lookahead:
+            self._read_next_chunk()
+        return row < self._num_rows
+
+    def rows(self, top: int, count: int) -> [str]:
+        """
+        Returns the count rows starting at row top; fewer if the document ends first.
+        """
+        self.has_row(top + count - 1)
+        end = min(top + count, self._num_rows)
+        if top >= end:
+            return []
+
+        rows = []
+        chunk = bisect_right(self._chunk_first_rows, top) - 1
+        skip = top - self._chunk_first_rows[chunk]
+        while len(rows) < end - top:
+            rows += self._chunk_rows(chunk)[skip:]
+            skip = 0
+            chunk += 1
+
+        # Drop the wrapped rows of chunks that are now well outside the window
+        first_kept = bisect_right(self._chunk_first_rows, max(0, top - self._lookahead)) - 1
+        last_kept = bisect_right(self._chunk_first_rows, end + self._lookahead)
+        self._rows_by_chunk = {i: chunk_rows for i, chunk_rows in self._rows_by_chunk.items() if first_kept <= i < last_kept}
+
+        return rows[:end - top]
+
+    def _wrap(self, lines: [str]) -> [str]:
+        """
+        Splits each of the lines into chunks that fit the screen width.  Empty lines still take up a row.
+        """
+        chunk_size = self._width - 1
+        rows = []
+        for line in lines:
+            rows += [line[x:x + chunk_size] for x in range(0, len(line), chunk_size)] or [""]
+        return rows
+
+    def _read_next_chunk(self):
+        """
+        Reads and wraps the next chunk of lines past those read so far.
+        """
+        offset = self._next_offset
+        lines, self._next_offset = self._read_lines(offset, self.CHUNK_LINES)
+        if not lines:
+            return
+        chunk_rows = self._wrap(lines)
+        self._rows_by_chunk[len(self._chunk_offsets)] = chunk_rows
+        self._chunk_offsets.append(offset)
+        self._chunk_first_rows.append(self._num_rows)
+        self._num_rows += len(chunk_rows)
+
+    def _chunk_rows(self, chunk: int) -> [str]:
+        """
+        Returns the wrapped rows of a chunk that was read before, reading and wrapping it again if it has been dropped.
+        """
+        if chunk not in self._rows_by_chunk:
+            lines, _ = self._read_lines(self._chunk_offsets[chunk], self.CHUNK_LINES)
+            self._rows_by_chunk[chunk] = self._wrap(lines)
+        return self._rows_by_chunk[chunk]
 
 
 class SearchUI:
@@ -40,30 +134,35 @@ class SearchUI:
         height_header = y + 2
         height_footer = 3
 
-        # Create a pad on which to print the search results and which we can scroll up and down.
         screen_ymax, screen_xmax = self._screen.getmaxyx()
-        results_pad = curses.newpad(1000, screen_xmax)
         results_pad_visible_height = screen_ymax - height_header - height_footer
 
+        # Split each line of each title into chunks that fit the screen width
+        # If a title has an empty line within it, the line is kept as an empty chunk
+        chunk_size = screen_xmax - 1
+        title_chunks = []
+        for result in results:
+            chunks = []
+            for line in result[2].split('\n'):
+                chunks += [line[x:x + chunk_size] for x in range(0, len(line), chunk_size)] or [""]
+            title_chunks.append(chunks)
+
+        # Create a pad just tall enough to print the search results on, and which we can scroll up and down.
+        # Each result takes a row for its header, a row for each title chunk, and a blank row to separate it from the next.
+        results_pad = curses.newpad(max(1, sum(len(chunks) + 2 for chunks in title_chunks)), screen_xmax)
+
         # Print the results onto the pad
         n, y = 0, 0
-        for result in results:
+        for result, chunks in zip(results, title_chunks):
             # Print the number, similarity score, and doc id of the result
             results_pad.addstr(y, 0, "[{}] ".format(n), curses.color_pair(self.BLUE))
             results_pad.addstr("({:0.2f}) {} ".format(result[0], result[1]), curses.color_pair(self.RED))
             y += 1
 
             # Print the Title of the result
-            title_lines = result[2].split('\n')
-            for line in title_lines:
-                # If title has an empty line within it we just increment the current y position
-                if not line:
-                    y += 1
-                # Split each line into chunks that fit the screen width
-                chunk_size = screen_xmax - 1
-                for chunk in [line[x:x + chunk_size] for x in range(0, len(line), chunk_size)]:
-                    results_pad.addstr(y, 0, chunk)
-                    y += 1
+            for chunk in chunks:
+                results_pad.addstr(y, 0, chunk)
+                y += 1
 
             # Increment the results printed counter n, and add a space between results by incrementing y
             n += 1
@@ -112,35 +211,23 @@ class SearchUI:
 
         return key
 
-    def document_page(self, document_text):
+    def document_page(self, read_lines, start_offset):
         """
-        Displays the provided document text and returns the state change key selected.
+        Displays the document beginning at start_offset and returns the state change key selected.
+        The document is read through read_lines (see DocumentDB.read_doc_lines()) in chunks of lines as it is scrolled.  Only the chunks covering
+        the visible window, plus a screen's worth of rows either side, are kept in memory, along with the file offset of each chunk read so far
+        for scrolling back.  Each line is read whole, so a single very long line is held in memory in full while its chunk is in view.
         """
         self._screen.clear()
 
         height_header = 0
         height_footer = 3
 
-        # Create a pad on which to print the document and which we can scroll up and down.
+        # Create a pad the size of the visible window on which to print the document, redrawing it as we scroll up and down.
         screen_ymax, screen_xmax = self._screen.getmaxyx()
-        doctext_pad = curses.newpad(5000, screen_xmax)
         doctext_pad_visible_height = screen_ymax - height_header - height_footer
-
-        # Print the document onto the pad
-        y = 0
-        doc_lines = document_text.split('\n')
-        for line in doc_lines:
-            # For empty lines we just increment the line position
-            if not line:
-                y += 1
-            # Split each line into chunks that fit the screen width
-            chunk_size = screen_xmax - 1
-            for chunk in [line[x:x + chunk_size] for x in range(0, len(line), chunk_size)]:
-                doctext_pad.addstr(y, 0, chunk)
-                y += 1
-
-        # Record number of lines of document print
-        nlines = y - 1
+        doctext_pad = curses.newpad(doctext_pad_visible_height + 1, screen_xmax)
+        document = _WrappedDocument(read_lines, start_offset, screen_xmax, doctext_pad_visible_height)
 
         # Print the controls message at the bottom of the screen
         self._screen.addstr(screen_ymax - 2, 0, "<u>", curses.color_pair(self.BLUE))
@@ -159,15 +246,18 @@ class SearchUI:
         # Exit display/scroll if a valid state change key is issued
         line_num = 0
         while True:
+            doctext_pad.erase()
+            for y, row in enumerate(document.rows(line_num, doctext_pad_visible_height)):
+                doctext_pad.addstr(y, 0, row)
             self._screen.refresh()
-            doctext_pad.refresh(line_num, 0, height_header, 0, screen_ymax - 1 - height_footer, screen_xmax - 1)
+            doctext_pad.refresh(0, 0, height_header, 0, screen_ymax - 1 - height_footer, screen_xmax - 1)
             key = self._screen.getkey(screen_ymax - 1, 0)
             if key == 'u':
                 line_num = max(0, line_num - 1)
             elif key == 'd':
-                if nlines <= doctext_pad_visible_height:
-                    continue
-                line_num = min(nlines - doctext_pad_visible_height, line_num + 1)
+                # Only scroll down while there are rows below the bottom of the window
+                if document.has_row(line_num + doctext_pad_visible_height):
+                    line_num += 1
             elif key in state_change_keys:
                 break
             else:
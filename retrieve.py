@@ -12,6 +12,8 @@ def parse_args():
     parser.add_argument("--docids-file", "-i", default="docids.txt")
     parser.add_argument("--documents-file", "-m", default="documents.txt")
     parser.add_argument("--normalize-scores", "-n", action="store_true")
+    parser.add_argument("--champions-file", "-c", default=None)
+    parser.add_argument("--min-candidates", "-k", type=int, default=10)
     return parser.parse_args()
 
 
@@ -23,14 +25,15 @@ def main(stdscr, args):
 
     ui = SearchUI(stdscr)
     results_per_page = 10
-    engine = build_engine_from_filepaths(args.dictionary_file, args.postings_file, args.normalize_scores)
+    engine = build_engine_from_filepaths(args.dictionary_file, args.postings_file, args.normalize_scores, args.champions_file, args.min_candidates)
     docs_db = build_documents_db_from_file_paths(args.docids_file, args.documents_file)
 
     def build_results(indices_and_scores, page_num):
         def build_result(doc_index, sim_score):
             doc_id, title = docs_db.get_doc_id_and_title(doc_index)
             return sim_score, doc_id, title
-        return [build_result(*indices_and_scores[i]) for i in range(page_num * results_per_page, (page_num + 1) * results_per_page)]
+        end = min((page_num + 1) * results_per_page, len(indices_and_scores))
+        return [build_result(*indices_and_scores[i]) for i in range(page_num * results_per_page, end)]
 
     # Main loop
     # We have 3 states organized in a hierarchy: EnterQueryPage->ShowQueryResultsPage->ShowDocumentPage
@@ -39,6 +42,7 @@ def main(stdscr, args):
         if not query:
             return
         indices_and_scores = engine.retrieve_matches(query)
+        exact = False
         page_num = 0
         results = build_results(indices_and_scores, page_num)
         while True:
@@ -49,14 +53,21 @@ def main(stdscr, args):
                 break
             elif key == 'n':
                 page_num += 1
+                # Results answered from the champion lists may run out before the collection does, so we rescore exactly when paging past them.
+                # The pages already shown are kept as they are, and the exact results not yet shown follow them.
+                if not exact and (page_num + 1) * results_per_page > len(indices_and_scores):
+                    shown = indices_and_scores[:page_num * results_per_page]
+                    shown_doc_indices = {doc_index for doc_index, _ in shown}
+                    exact_matches = engine.retrieve_matches(query, exact=True)
+                    indices_and_scores = shown + [match for match in exact_matches if match[0] not in shown_doc_indices]
+                    exact = True
                 results = build_results(indices_and_scores, page_num)
             elif key == 'p':
                 page_num = max(0, page_num - 1)
                 results = build_results(indices_and_scores, page_num)
-            else:
+            elif int(key) < len(results):
                 doc_id = results[int(key)][1]
-                doc_text = docs_db.get_doc_text(doc_id)
-                key = ui.document_page(doc_text)  # ShowDocumentPage state
+                key = ui.document_page(docs_db.read_doc_lines, docs_db.get_doc_text_start(doc_id))  # ShowDocumentPage state
                 if key == 'q':
                     return
 